@@ -22,6 +22,7 @@ from tools.crm_mock import (
     update_service_record,
 )
 import datetime
+import hashlib
 import logging
 import os
 import sys
@@ -56,7 +57,9 @@ supported_model_names = [default_model_name]
 model_name = os.getenv("MODEL_AGENT_NAME", default_model_name)
 if model_name not in supported_model_names:
     logging.warning(
-        f"MODEL_AGENT_NAME must be one of {supported_model_names}, if not, the MODEL_AGENT_NAME will be set to default_model_name: {default_model_name}"
+        "MODEL_AGENT_NAME must be one of %s, if not, the MODEL_AGENT_NAME will be set to default_model_name: %s",
+        supported_model_names,
+        default_model_name,
     )
     model_name = default_model_name
 
@@ -72,25 +75,58 @@ else:
     raise ValueError("DATABASE_VIKING_COLLECTION environment variable is not set")
 
 
-should_init_knowledge = False
-try:
-    test_knowledge = knowledge.search("商品退换策略", top_k=1)
-    should_init_knowledge = not (
-        len(test_knowledge) >= 0
-        and test_knowledge[0].content != ""
-        and str(test_knowledge[0].content).__contains__("商品退换策略")
-    )
-except Exception:
-    should_init_knowledge = True
-
-if should_init_knowledge:
-    tos_bucket_name = os.getenv("DATABASE_TOS_BUCKET")
-    if not tos_bucket_name:
-        raise ValueError("DATABASE_TOS_BUCKET environment variable is not set")
-    knowledge.add_from_directory(
-        str(Path(__file__).resolve().parent) + "/pre_build/knowledge",
-        tos_bucket_name=tos_bucket_name,
-    )
+knowledge_dir = Path(__file__).resolve().parent / "pre_build" / "knowledge"
+ingest_manifest_path = knowledge_dir / ".ingest_manifest"
+
+
+def _knowledge_digest(directory: Path) -> str:
+    """计算知识库目录的内容指纹，基于各文件的相对路径、修改时间和大小"""
+    digest = hashlib.sha256()
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and not path.name.startswith("."):
+            stat = path.stat()
+            digest.update(
+                f"{path.relative_to(directory)}|{stat.st_mtime_ns}|{stat.st_size}".encode()
+            )
+    return digest.hexdigest()
+
+
+def _ensure_knowledge_ingested() -> None:
+    """通过本地指纹文件判断知识库目录是否已经入库：指纹一致说明内容未变化，
+    直接跳过探测与导入，避免每次进程启动都重新上传、重新向量化同一批文件"""
+    knowledge_digest = _knowledge_digest(knowledge_dir)
+    try:
+        ingested_digest = ingest_manifest_path.read_text().strip()
+    except OSError:
+        ingested_digest = ""
+    if knowledge_digest == ingested_digest:
+        return
+
+    if ingested_digest:
+        # 本地内容发生变化，需要重新入库
+        should_init_knowledge = True
+    else:
+        # 本地还没有指纹（首次运行），先探测远端知识库是否已初始化
+        try:
+            test_knowledge = knowledge.search("商品退换策略", top_k=1)
+            should_init_knowledge = not (
+                len(test_knowledge) >= 0
+                and test_knowledge[0].content != ""
+                and str(test_knowledge[0].content).__contains__("商品退换策略")
+            )
+        except Exception:
+            should_init_knowledge = True
+
+    if should_init_knowledge:
+        tos_bucket_name = os.getenv("DATABASE_TOS_BUCKET")
+        if not tos_bucket_name:
+            raise ValueError("DATABASE_TOS_BUCKET environment variable is not set")
+        knowledge.add_from_directory(
+            str(knowledge_dir),
+            tos_bucket_name=tos_bucket_name,
+        )
+
+    ingest_manifest_path.write_text(knowledge_digest)
 
 # 3. 配置长期记忆: 如果配置了Mem0，就使用Mem0，否则使用Viking，都不配置，默认创建一个Viking记忆库
 use_mem0 = os.getenv("DATABASE_MEM0_BASE_URL") and os.getenv("DATABASE_MEM0_API_KEY")
@@ -121,20 +157,47 @@ crm_tool = [
 ]
 
 
-# 5. 通过前置拦截器，在智能体执行前，设置默认的customer_id
+# 时间格式化按分钟缓存：strftime 开销相对较大，同一分钟内的多轮对话
+# 复用分钟级前缀，仅秒数逐次拼接，输出格式保持 %Y-%m-%d %H:%M:%S 不变
+_cached_minute_key = None
+_cached_minute_text = ""
+
+
+def _format_now() -> str:
+    global _cached_minute_key, _cached_minute_text
+    now = datetime.datetime.now()
+    minute_key = (now.year, now.month, now.day, now.hour, now.minute)
+    if minute_key != _cached_minute_key:
+        _cached_minute_text = now.strftime("%Y-%m-%d %H:%M")
+        _cached_minute_key = minute_key
+    return f"{_cached_minute_text}:{now.second:02d}"
+
+
+# 5. 通过前置拦截器，在智能体执行前，设置默认的customer_id，并刷新提示词中的当前时间
 def before_agent_execution(callback_context: CallbackContext):
     # user_id = callback_context._invocation_context.user_id
     callback_context.state["user:customer_id"] = default_user_id
+    callback_context.state["current_time"] = _format_now()
+
+
+# 记录每个会话上次保存时的事件数。回调挂在根Agent和两个子Agent上，
+# 一轮对话会触发多次；只有产生新事件时才真正写入长期记忆，避免重复保存整个会话
+_saved_event_counts: dict = {}
 
 
 # 这里仅做记忆保存的演示，实际根据需求选择会话保存到长期记忆中
 async def after_agent_execution(callback_context: CallbackContext):
     session = callback_context._invocation_context.session
+    event_count = len(session.events)
+    if _saved_event_counts.get(session.id) == event_count:
+        return
+    _saved_event_counts[session.id] = event_count
     await long_term_memory.add_session_to_memory(session)
 
 
-after_sale_prompt = (
-    """
+# 提示词拆分为「静态前缀 + 动态后缀」两段：大段策略文本作为稳定前缀，
+# 当前时间等动态内容统一追加在末尾，保证前缀逐字节稳定，便于命中模型服务的前缀缓存
+AFTER_SALE_STATIC = """
     你是一名专业且耐心的在线客服，负责协助客户处理咨询及商品售后服务。可使用内部工具和知识库，但需严格遵守以下准则：
     
     <指导原则>
@@ -162,8 +225,17 @@ after_sale_prompt = (
     
     当前登录客户为： {user:customer_id} 。
         """
-    + "当前时间为："
-    + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+# 当前时间通过状态变量按轮注入（见 before_agent_execution），
+# 不再在导入时烘焙进提示词
+after_sale_prompt = AFTER_SALE_STATIC + "当前时间为：{current_time}"
+
+# 两个子Agent的思考配置完全相同，在模块级构建一次后复用
+planner = BuiltInPlanner(
+    thinking_config=ThinkingConfig(
+        include_thoughts=True,
+        thinking_budget=1024,
+    )
 )
 
 after_sale_agent = Agent(
@@ -171,12 +243,7 @@ after_sale_agent = Agent(
     model_name=model_name,
     description=" 售后Agent：根据客户的售后问题，帮助客户处理商品的售后问题(信息查询、商品报修等)",
     instruction=after_sale_prompt,
-    planner=BuiltInPlanner(
-        thinking_config=ThinkingConfig(
-            include_thoughts=True,
-            thinking_budget=1024,
-        )
-    ),
+    planner=planner,
     knowledgebase=knowledge,
     long_term_memory=long_term_memory,
     tools=crm_tool,
@@ -185,8 +252,7 @@ after_sale_agent = Agent(
     run_processor=AuthRequestProcessor(),
 )
 
-shopping_guide_prompt = (
-    """
+SHOPPING_GUIDE_STATIC = """
     你是一名专业且耐心的在线客服，你的首要任务是帮助客户购买商品。你可使用工具或者检索知识库来 准确并简洁的回答客户问题.
     
     在回答客户问题以及协助客户的过程中时，请始终遵循以下指导原则：
@@ -211,20 +277,14 @@ shopping_guide_prompt = (
     
     当前登录客户为： {user:customer_id}
         """
-    + "当前时间为："
-    + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-)
+
+shopping_guide_prompt = SHOPPING_GUIDE_STATIC + "当前时间为：{current_time}"
 
 shopping_guide_agent = Agent(
     name="shopping_guide_agent",
     model_name=model_name,
     description="根据客户的购买需求，帮助客户选择合适的商品，引导客户完成购买流程",
-    planner=BuiltInPlanner(
-        thinking_config=ThinkingConfig(
-            include_thoughts=True,
-            thinking_budget=1024,
-        )
-    ),
+    planner=planner,
     knowledgebase=knowledge,
     long_term_memory=long_term_memory,
     tools=[get_customer_info, get_customer_purchases],
@@ -259,5 +319,13 @@ agent_server_app = AgentkitAgentServerApp(
     agent=root_agent, short_term_memory=short_term_memory
 )
 
+# 知识库探测与导入涉及网络IO，挂到服务启动阶段执行，不在模块导入时做；
+# 拿不到底层 FastAPI 应用时（如被工具脚本直接导入）退回立即执行
+fastapi_app = getattr(agent_server_app, "app", None)
+if fastapi_app is not None:
+    fastapi_app.add_event_handler("startup", _ensure_knowledge_ingested)
+else:
+    _ensure_knowledge_ingested()
+
 if __name__ == "__main__":
     agent_server_app.run(host="0.0.0.0", port=8000)
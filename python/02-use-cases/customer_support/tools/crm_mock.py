@@ -12,10 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
+from itertools import islice
 from typing import Optional
 
 from pydantic import BaseModel
 
+# 序列号格式：SN + 8位数字。模块加载时预编译一次，避免每次查询重复编译
+_SERIAL_NUMBER_PATTERN = re.compile(r"^SN\d{8}$")
+
 
 class ServiceRecordCreate(BaseModel):
     serial_number: str
@@ -33,6 +38,66 @@ class ServiceRecordUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+mock_customers = {
+    "CUST001": {
+        "customer_id": "CUST001",
+        "name": "张明",
+        "email": "zhang.ming@example.com",
+        "address": "北京市朝阳区建国门外大街1号",
+        "registration_date": "2022-03-15",
+        "date_of_birth": "1985-10-20",
+        "notes": "优质客户，经常购买高端产品",
+        "total_purchases": 3,
+        "lifetime_value": 28500.00,
+        "support_cases_count": 2,
+        "communication_preferences": ["email", "sms"],
+    },
+}
+
+mock_products = [
+    {
+        "product_id": "PROD001",
+        "serial_number": "SN20240001",
+        "product_name": "智能电视 65寸",
+        "customer_id": "CUST001",
+        "purchase_date": "2023-12-10",
+        "warranty_end_date": "2025-12-10",
+        "warranty_type": "standard",
+        "status": "active",
+    },
+    {
+        "product_id": "PROD002",
+        "serial_number": "SN20240002",
+        "product_name": "智能音箱 Pro",
+        "customer_id": "CUST001",
+        "purchase_date": "2023-08-15",
+        "warranty_end_date": "2024-08-15",
+        "warranty_type": "extended",
+        "status": "active",
+    },
+]
+
+mock_warranties = {
+    "SN20240001": {
+        "serial_number": "SN20240001",
+        "product_name": "智能电视 65寸",
+        "customer_id": "CUST001",
+        "purchase_date": "2023-12-10",
+        "warranty_end_date": "2025-12-10",
+        "warranty_type": "standard",
+        "status_text": "保修有效",
+    },
+    "SN20240002": {
+        "serial_number": "SN20240002",
+        "product_name": "智能音箱 Pro",
+        "customer_id": "CUST001",
+        "purchase_date": "2023-08-15",
+        "warranty_end_date": "2024-08-15",
+        "warranty_type": "extended",
+        "status_text": "保修已经过期",
+    },
+}
+
 mock_service_records = [
     {
         "record_id": "SRV001",
@@ -49,6 +114,26 @@ mock_service_records = [
     },
 ]
 
+# 二级索引：按客户ID/记录ID直接定位，避免每次查询都线性扫描全量数据。
+# 在 create/update/delete 中同步维护，保证索引与记录列表一致
+_products_by_customer: dict = {}
+for _product in mock_products:
+    _products_by_customer.setdefault(_product["customer_id"], []).append(_product)
+
+_records_by_customer: dict = {}
+_records_by_id: dict = {}
+_record_ids_by_serial: dict = {}
+_record_ids_by_status: dict = {}
+for _record in mock_service_records:
+    _records_by_customer.setdefault(_record["customer_id"], []).append(_record)
+    _records_by_id[_record["record_id"]] = _record
+    _record_ids_by_serial.setdefault(_record["serial_number"], set()).add(
+        _record["record_id"]
+    )
+    _record_ids_by_status.setdefault(_record["status"], set()).add(
+        _record["record_id"]
+    )
+
 
 def get_customer_info(customer_id: str) -> dict:
     """
@@ -56,53 +141,23 @@ def get_customer_info(customer_id: str) -> dict:
     :param customer_id: 客户ID
     :return: 客户信息字典或错误信息字典
     """
-    if customer_id != "CUST001":
+    customer = mock_customers.get(customer_id)
+    if customer is None:
         return {"error": "Customer not found"}
-    return {
-        "customer_id": "CUST001",
-        "name": "张明",
-        "email": "zhang.ming@example.com",
-        "address": "北京市朝阳区建国门外大街1号",
-        "registration_date": "2022-03-15",
-        "date_of_birth": "1985-10-20",
-        "notes": "优质客户，经常购买高端产品",
-        "total_purchases": 3,
-        "lifetime_value": 28500.00,
-        "support_cases_count": 2,
-        "communication_preferences": ["email", "sms"],
-    }
+    return customer
 
 
-def get_customer_purchases(customer_id: str) -> list:
+def get_customer_purchases(customer_id: str, limit: int = 50, offset: int = 0) -> list:
     """
-    查询客户购买记录
+    查询客户购买记录，支持分页
     :param customer_id: 客户ID
+    :param limit: 单次返回的最大记录数
+    :param offset: 跳过的记录数
     :return: 客户购买记录列表或空列表
     """
-    if customer_id != "CUST001":
-        return []
-    return [
-        {
-            "product_id": "PROD001",
-            "serial_number": "SN20240001",
-            "product_name": "智能电视 65寸",
-            "customer_id": "CUST001",
-            "purchase_date": "2023-12-10",
-            "warranty_end_date": "2025-12-10",
-            "warranty_type": "standard",
-            "status": "active",
-        },
-        {
-            "product_id": "PROD002",
-            "serial_number": "SN20240002",
-            "product_name": "智能音箱 Pro",
-            "customer_id": "CUST001",
-            "purchase_date": "2023-08-15",
-            "warranty_end_date": "2024-08-15",
-            "warranty_type": "extended",
-            "status": "active",
-        },
-    ]
+    purchases = _products_by_customer.get(customer_id, [])
+    # islice 惰性切片，只物化请求的分页窗口
+    return list(islice(purchases, offset, offset + limit))
 
 
 def query_warranty(serial_number: str) -> dict:
@@ -111,38 +166,40 @@ def query_warranty(serial_number: str) -> dict:
     :param serial_number: 商品序列号
     :return: 保修信息字典或错误信息字典
     """
-    if serial_number not in ["SN20240001", "SN20240002"]:
+    if not _SERIAL_NUMBER_PATTERN.match(serial_number):
         return {"error": "Warranty not found"}
-    if serial_number == "SN20240001":
-        return {
-            "serial_number": "SN20240001",
-            "product_name": "智能电视 65寸",
-            "customer_id": "CUST001",
-            "purchase_date": "2023-12-10",
-            "warranty_end_date": "2025-12-10",
-            "warranty_type": "standard",
-            "status_text": "保修有效",
-        }
-    return {
-        "serial_number": "SN20240002",
-        "product_name": "智能音箱 Pro",
-        "customer_id": "CUST001",
-        "purchase_date": "2023-08-15",
-        "warranty_end_date": "2024-08-15",
-        "warranty_type": "extended",
-        "status_text": "保修已经过期",
-    }
+    warranty = mock_warranties.get(serial_number)
+    if warranty is None:
+        return {"error": "Warranty not found"}
+    return warranty
 
 
-def get_service_records(customer_id: str) -> list:
+def get_service_records(
+    customer_id: str,
+    serial_number: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list:
     """
-    查询客户维修记录
+    查询客户维修记录，可按商品序列号、记录状态过滤
     :param customer_id: 客户ID
+    :param serial_number: 商品序列号（可选）
+    :param status: 记录状态（可选）
     :return: 客户维修记录列表或空列表
     """
-    if customer_id != "CUST001":
-        return []
-    return mock_service_records
+    records = _records_by_customer.get(customer_id, [])
+    if serial_number is None and status is None:
+        return records
+
+    # 先用集合求出各过滤条件命中记录ID的交集，再按客户维度的原始顺序输出
+    candidate_ids = None
+    if serial_number is not None:
+        candidate_ids = _record_ids_by_serial.get(serial_number, set())
+    if status is not None:
+        status_ids = _record_ids_by_status.get(status, set())
+        candidate_ids = (
+            status_ids if candidate_ids is None else candidate_ids & status_ids
+        )
+    return [r for r in records if r["record_id"] in candidate_ids]
 
 
 def create_service_record(
@@ -170,6 +227,10 @@ def create_service_record(
         "notes": None,
     }
     mock_service_records.append(r)
+    _records_by_customer.setdefault(customer_id, []).append(r)
+    _records_by_id[r["record_id"]] = r
+    _record_ids_by_serial.setdefault(r["serial_number"], set()).add(r["record_id"])
+    _record_ids_by_status.setdefault(r["status"], set()).add(r["record_id"])
     return r
 
 
@@ -184,16 +245,19 @@ def update_service_record(
     """
     if customer_id != "CUST001":
         return {"error": "Customer not found"}
-    for r in mock_service_records:
-        if r["record_id"] == service_id:
-            r["service_date"] = service_record.service_date or r["service_date"]
-            r["status"] = service_record.status or r["status"]
-            r["actual_duration"] = (
-                service_record.actual_duration or r["actual_duration"]
-            )
-            r["notes"] = service_record.notes or r["notes"]
-            return r
-    return {"error": "Service record not found"}
+    r = _records_by_id.get(service_id)
+    if r is None:
+        return {"error": "Service record not found"}
+    r["service_date"] = service_record.service_date or r["service_date"]
+    new_status = service_record.status or r["status"]
+    if new_status != r["status"]:
+        # 状态变化时，把记录ID挪到新状态对应的索引桶
+        _record_ids_by_status[r["status"]].discard(r["record_id"])
+        _record_ids_by_status.setdefault(new_status, set()).add(r["record_id"])
+        r["status"] = new_status
+    r["actual_duration"] = service_record.actual_duration or r["actual_duration"]
+    r["notes"] = service_record.notes or r["notes"]
+    return r
 
 
 def delete_service_record(customer_id: str, service_id: str) -> dict:
@@ -204,8 +268,11 @@ def delete_service_record(customer_id: str, service_id: str) -> dict:
     """
     if customer_id != "CUST001":
         return {"error": "Customer not found"}
-    for r in mock_service_records:
-        if r["record_id"] == service_id:
-            mock_service_records.remove(r)
-            return {"service_id": service_id, "status": "deleted"}
-    return {"error": "Service record not found"}
+    r = _records_by_id.pop(service_id, None)
+    if r is None:
+        return {"error": "Service record not found"}
+    mock_service_records.remove(r)
+    _records_by_customer[r["customer_id"]].remove(r)
+    _record_ids_by_serial[r["serial_number"]].discard(r["record_id"])
+    _record_ids_by_status[r["status"]].discard(r["record_id"])
+    return {"service_id": service_id, "status": "deleted"}
@@ -45,10 +45,12 @@ app_name = "storyvideo"
 app = AgentkitSimpleApp()
 agent_builder = AgentBuilder()
 
-# 配置MCP Tool，用于视频剪辑
+# 配置MCP Tool，用于视频剪辑。
+# McpToolset 在模块级只创建一次，MCP 子进程会在多次工具调用间复用；
+# npx 加 -y --prefer-offline，优先使用本地缓存，避免每次拉起子进程都访问 npm registry
 server_parameters = StdioServerParameters(
     command="npx",
-    args=["@pickstar-2002/video-clip-mcp@latest"],
+    args=["-y", "--prefer-offline", "@pickstar-2002/video-clip-mcp@latest"],
 )
 mcpTool = McpToolset(
     connection_params=StdioConnectionParams(
@@ -3,6 +3,7 @@ import hashlib
 import hmac
 import secrets
 import string
+import time
 from typing import Optional
 import requests
 import volcenginesdkcore
@@ -265,6 +266,13 @@ def setup_veidentity_user_pool(
         return None
 
 
+# 缓存按 (client_id, pool_id, username) 维度的 Access Token，
+# TTL 内复用缓存结果，避免每次调用都走一轮 USER_PASSWORD_AUTH 认证请求。
+# TTL 取保守的 5 分钟，远小于令牌本身的有效期
+_TOKEN_CACHE_TTL_SECONDS = 300
+_token_cache = {}
+
+
 def reauthenticate_user(
     *,
     client_id: str,
@@ -272,6 +280,11 @@ def reauthenticate_user(
     preferred_username="testuser",
     client_secret: Optional[str] = None,
 ):
+    cache_key = (client_id, pool_id, preferred_username)
+    cached = _token_cache.get(cache_key)
+    if cached and time.monotonic() - cached[1] < _TOKEN_CACHE_TTL_SECONDS:
+        return cached[0]
+
     # Initialize veIdentity client
     auth_response = veidentity_initiate_auth(
         client_id=client_id,
@@ -285,6 +298,7 @@ def reauthenticate_user(
         custom_domain=f"https://auth.{settings.veidentity.get_endpoint()}",
     )
     bearer_token = auth_response["Result"]["AuthenticationResult"]["AccessToken"]
+    _token_cache[cache_key] = (bearer_token, time.monotonic())
     return bearer_token
 
 
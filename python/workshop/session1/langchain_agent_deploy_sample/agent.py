@@ -44,6 +44,23 @@ agent = create_agent(
 app = AgentkitSimpleApp()
 
 
+# orjson serializes significantly faster than the stdlib json on the per-event
+# hot path; fall back to json when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_event(event_data: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(event_data).decode()
+    # Compact separators and ensure_ascii=False keep streamed events small:
+    # no whitespace padding and no \uXXXX expansion of non-ASCII text, so the
+    # server app has fewer bytes to encode per SSE frame.
+    return json.dumps(event_data, ensure_ascii=False, separators=(",", ":"))
+
+
 @app.entrypoint
 async def run(payload: dict, headers: dict):
     prompt = payload.get("prompt")
@@ -55,31 +72,46 @@ async def run(payload: dict, headers: dict):
     session_id = session_id or "default_session"
 
     logger.info(
-        f"Running agent with prompt: {prompt}, user_id: {user_id}, session_id: {session_id}"
+        "Running agent with prompt: %s, user_id: %s, session_id: %s",
+        prompt,
+        user_id,
+        session_id,
     )
 
     inputs = {"messages": [{"role": "user", "content": prompt}]}
 
-    # stream returns an iterator of updates
-    # To get the final result, we can just iterate or use invoke
-    async for chunk in agent.astream(inputs, stream_mode="updates"):
-        # chunk is a dict with node names as keys and state updates as values
-        for node, state in chunk.items():
-            logger.debug(f"--- Node: {node} ---")
-
-            if "messages" in state:
-                last_msg = state["messages"][-1]
-
-                for block in last_msg.content_blocks:
-                    # 返回的event_data数据结构要求符合 adk event规范： https://google.github.io/adk-docs/events/#identifying-event-origin-and-type
-                    event_data = {
-                        "content": {
-                            "parts": [
-                                {"text": block.get("text") or block.get("reasoning")}
-                            ]
+    try:
+        # stream returns an iterator of updates
+        # To get the final result, we can just iterate or use invoke
+        async for chunk in agent.astream(inputs, stream_mode="updates"):
+            # chunk is a dict with node names as keys and state updates as values
+            for node, state in chunk.items():
+                # Guarded so the message is only formatted when DEBUG logging is
+                # on; this runs once per streamed update.
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("--- Node: %s ---", node)
+
+                if "messages" in state:
+                    last_msg = state["messages"][-1]
+
+                    for block in last_msg.content_blocks:
+                        # 返回的event_data数据结构要求符合 adk event规范： https://google.github.io/adk-docs/events/#identifying-event-origin-and-type
+                        event_data = {
+                            "content": {
+                                "parts": [
+                                    {
+                                        "text": block.get("text")
+                                        or block.get("reasoning")
+                                    }
+                                ]
+                            }
                         }
-                    }
-                    yield json.dumps(event_data)
+                        yield _dump_event(event_data)
+    except Exception as e:
+        logger.exception("Agent stream failed")
+        # Serialize the error through the JSON dumper so the message is escaped
+        # safely instead of being interpolated into a handwritten frame.
+        yield _dump_event({"error": str(e)})
 
 
 @app.ping
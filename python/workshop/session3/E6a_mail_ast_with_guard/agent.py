@@ -41,6 +41,10 @@ app = AgentkitSimpleApp()
 app_name = "simple_app"
 model_name = "deepseek-v3-250324"
 
+# 复用同一个 Session 做连接池，权限检查发生在每次模型调用前后，
+# 避免每次检查都重新建立 TCP/TLS 连接
+_guard_session = requests.Session()
+
 
 class BeforeModelPermissionCallback:
     """模型调用前的权限检查回调"""
@@ -64,7 +68,7 @@ class BeforeModelPermissionCallback:
                 "Content-Type": "application/json",
             }
 
-            resp = requests.post(
+            resp = _guard_session.post(
                 f"{self.service_url}/before_check",
                 json=payload,
                 headers=headers,
@@ -117,7 +121,7 @@ class AfterModelPermissionCallback:
                 "Content-Type": "application/json",
             }
 
-            resp = requests.post(
+            resp = _guard_session.post(
                 f"{self.service_url}/check", json=payload, headers=headers, timeout=200
             )
             resp.raise_for_status()